@@ -17,18 +17,189 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+from sys import stdout
 from argparse import ArgumentParser
 from csv import Sniffer, reader as csvreader, Error as CsvError, DictReader
-from re import compile
-from collections import Counter
+# The third-party regex module is a drop-in replacement with a faster
+# matcher for the fallback search path; it is optional.
+try:
+    from regex import compile
+except ImportError:
+    from re import compile
+from functools import lru_cache
+from heapq import nlargest
 from random import choice, sample
 from multiprocessing import cpu_count, Pool
 
+# NumPy and Numba are optional: with NumPy the candidate filter runs as
+# vectorized array ops, with Numba as LLVM-compiled machine code, and
+# with neither the plain Python loop is used.
+try:
+    from numpy import bitwise_or, empty, flatnonzero, frombuffer, int32, \
+                      uint8, uint32, zeros
+except ImportError:
+    zeros = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Set as globals for multiprocessing
 WORD_LENGTH = 5
+ALL_LETTERS = (1 << 26) - 1
+POW3 = tuple(3**i for i in range(WORD_LENGTH))
+ALL_GREEN = 3**WORD_LENGTH - 1
+
+def is_word(s):
+    """Five lowercase ASCII letters -- C-level checks, no regex."""
+    return len(s) == WORD_LENGTH and s.isascii() and s.islower() and \
+           s.isalpha()
 THE_WORDS = []
+WORDS_BUF = b""
+WORD_SET = set()
+WORD_MASKS = []
+WORD_LETTERS = {}
+WORD_DISTINCT = {}
+LETTER_RANK = [0] * 26
+NP_MASKS = None
+NP_POSITIONS = None
+NP_POS_BITS = None
+NP_OUT = None
 ARGUMENTS = None
 
+@lru_cache(maxsize=4096)
+def compile_search(ss):
+    """Cache compiled search patterns across guesses and games. Forked
+    simulator workers inherit any patterns compiled in the parent.
+    """
+    return compile(ss)
+
+@lru_cache(maxsize=65536)
+def gen_weights(words):
+    """Tally letters across a candidate tuple, group them by 10% and
+    flatten the groups into a per-letter weight table. Simulated games
+    keep converging to identical candidate sets after a few guesses, so
+    the result is cached per process keyed on the tuple.
+    """
+    counts = [0] * 26
+    for w in words:
+        for c in WORD_LETTERS[w]:
+            counts[c] += 1
+    letter_count = sorted(((chr(c + 97), n) for c, n in
+                           enumerate(counts) if n),
+                          key=lambda lc: lc[1], reverse=True)
+
+    # Group the letters by 10%.
+    letter_groups = {i:[] for i in range(7)}
+    i, rank = (0, 0)
+    for letter, count in letter_count:
+        if rank == 0:
+            rank = count
+        letter_groups.setdefault(i, [])
+        if count <= int(.9*rank):
+            i += 1
+            rank = count
+            letter_groups.setdefault(i, [])
+        letter_groups[i].extend(letter)
+
+    weights = [0] * 26
+    for group, mult in enumerate((7, 6, 5, 4, 3, 2, 1)):
+        for l in letter_groups[group]:
+            weights[ord(l) - 97] = mult
+    return letter_count, letter_groups, tuple(weights)
+
+@lru_cache(maxsize=65536)
+def rank_words(words, weights):
+    """Sort a candidate tuple by letter-frequency score, cached per
+    process since repeat states skip the whole sort.
+    """
+    return tuple(sorted(words, key=gen_scorer(weights), reverse=True))
+
+SCORER_CACHE = {}
+
+def gen_scorer(weights):
+    """Partially evaluate the scoring function for a weight table by
+    exec'ing a straight-line expression with the weights baked in as a
+    literal -- no loop or generator per scored word. Cached per table
+    since the same letter groups recur across turns.
+    """
+    try:
+        return SCORER_CACHE[weights]
+    except KeyError:
+        terms = " + ".join(f"_W[l[{i}]]" for i in range(WORD_LENGTH))
+        src = (f"def scorer(w, _L=_L, _D=_D, _W={tuple(weights)!r}):\n"
+               f"    l = _L[w]\n"
+               f"    return {terms} + _D[w] * 8\n")
+        namespace = {"_L": WORD_LETTERS, "_D": WORD_DISTINCT}
+        exec(src, namespace)
+        scorer = SCORER_CACHE[weights] = namespace["scorer"]
+        return scorer
+
+if njit:
+    @njit(cache=True, boundscheck=False)
+    def filter_words(masks, positions, required_mask, pos_allow, out_idx):
+        """Write the indices of words consistent with the constraint masks
+        into out_idx and return how many there are.
+        """
+        k = 0
+        for i in range(masks.shape[0]):
+            if masks[i] & required_mask == required_mask:
+                ok = True
+                for p in range(WORD_LENGTH):
+                    if not pos_allow[p] & (uint32(1) << positions[i, p]):
+                        ok = False
+                        break
+                if ok:
+                    out_idx[k] = i
+                    k += 1
+        return k
+
+def build_word_tables():
+    """Derive the per-word lookup tables from THE_WORDS."""
+    global WORDS_BUF, WORD_SET, WORD_MASKS, WORD_LETTERS, WORD_DISTINCT, \
+           LETTER_RANK
+    WORDS_BUF = ''.join(THE_WORDS).encode()
+    WORD_SET = set(THE_WORDS)
+    WORD_MASKS = word_masks(THE_WORDS)
+    WORD_LETTERS = {w: pos for w, _, pos in WORD_MASKS}
+    WORD_DISTINCT = {w: len(set(pos)) for w, _, pos in WORD_MASKS}
+    LETTER_RANK = [0] * 26
+    for _, _, pos in WORD_MASKS:
+        for c in pos:
+            LETTER_RANK[c] += 1
+    # Anything memoized against the previous tables is stale now.
+    SCORER_CACHE.clear()
+    gen_weights.cache_clear()
+    rank_words.cache_clear()
+    build_np_tables()
+
+def build_np_tables():
+    """Derive the NumPy filter tables from the packed word buffer in a
+    few whole-array ops. Built once per process; simulator workers
+    inherit them via fork.
+    """
+    global NP_MASKS, NP_POSITIONS, NP_POS_BITS, NP_OUT
+    if zeros is None:
+        return
+    letters = (frombuffer(WORDS_BUF, dtype=uint8).astype(uint32) -
+               97).reshape(-1, WORD_LENGTH)
+    NP_POSITIONS = letters.astype(uint8)
+    NP_POS_BITS = (uint32(1) << letters).astype(uint32)
+    NP_MASKS = bitwise_or.reduce(NP_POS_BITS, axis=1)
+    NP_OUT = empty(len(WORD_MASKS), dtype=int32)
+
+def word_masks(words):
+    """Build a (word, presence mask, letter indices) tuple per word where
+    the mask has bit (ord(letter)-97) set for each letter present.
+    """
+    masks = []
+    for w in words:
+        mask = 0
+        for c in w:
+            mask |= 1 << (ord(c) - 97)
+        masks.append((w, mask, tuple(ord(c) - 97 for c in w)))
+    return masks
+
 def user_guess(wrdl):
     """Prompt the user for input and increment num_guess.
     This is a callback for the Wordle.play() method.
@@ -44,10 +215,16 @@ def user_guess(wrdl):
             if len(wrdl.potential_words) < 5:
                 suggestions = wrdl.potential_words
             else:
-                suggestions = sample(wrdl.potential_words, 5)
+                # Vary the hints a little, but once the list has been
+                # ranked only draw from its better end. A merely
+                # searched list is still in dictionary order, so sample
+                # it whole.
+                pool = wrdl.potential_words[:200] if wrdl.ranked else \
+                       wrdl.potential_words
+                suggestions = sample(pool, 5)
             print(f'Suggestions: {", ".join(suggestions)}')
             continue
-        elif len(wrdl.user_word) != WORD_LENGTH or wrdl.user_word not in THE_WORDS:
+        elif len(wrdl.user_word) != WORD_LENGTH or wrdl.user_word not in WORD_SET:
             wrdl.printer(f"{wrdl.user_word}: not a usable word")
             wrdl.potential_words = []
             continue
@@ -62,14 +239,20 @@ class Wordle():
                  first=None, word=None, **kwargs):
         self.game_word = word if word else choice(list(THE_WORDS.keys())
                          if isinstance(THE_WORDS, dict) else THE_WORDS)
+        self.game_lower = self.game_word.lower()
+        self.game_set = frozenset(self.game_lower)
+        self.first = first
         self.srch_str = ["[a-z]"] * WORD_LENGTH
         self.potential_words = [first] if first else []
-        self.wrdl = [None] * WORD_LENGTH
+        self.ranked = False
+        self.wrdl = [""] * WORD_LENGTH
+        self.feedback = 0
         self.num_guess = 0
         self.blacked_out = set()
         self.unknown_chars = {i: set() for i in range(WORD_LENGTH)}
         self.assistance = assistance
         self.simulate = simulate
+        self.verbosity = verbose
         self.verbose = print if verbose else lambda *a, **k: None
         self.suggestion = lambda x: print(f"Suggestions: {x}") if assistance and not verbose else lambda x: None
         self.quiet = False
@@ -77,90 +260,177 @@ class Wordle():
         self.user_word = None
         self.frequency = None
 
+    def reset(self, word=None):
+        """Reset per-game state so one instance can play many games
+        without reallocating its structures or closures.
+        """
+        if word:
+            self.game_word = word
+        self.game_lower = self.game_word.lower()
+        self.game_set = frozenset(self.game_lower)
+        self.srch_str[:] = ["[a-z]"] * WORD_LENGTH
+        self.potential_words = [self.first] if self.first else []
+        self.ranked = False
+        self.wrdl[:] = [""] * WORD_LENGTH
+        self.feedback = 0
+        self.num_guess = 0
+        self.blacked_out.clear()
+        for chars in self.unknown_chars.values():
+            chars.clear()
+        self.user_word = None
+        self.frequency = None
+
     def search_dictionary(self):
         """Consult known matched characters `self.srch_str` to narrow down
-        word candidates.
+        word candidates. Each word carries a 26-bit letter-presence mask, so
+        candidates are kept with integer ANDs against a required-letter mask
+        and a per-position allowed-letter mask -- no regex engine involved.
+        """
+        self.ranked = False
+        if not WORD_MASKS:
+            self.__search_dictionary_regex()
+            return
+        required_mask = 0
+        pos_allow = [ALL_LETTERS] * WORD_LENGTH
+        for i, v in enumerate(self.srch_str):
+            if len(v) == 1:
+                required_mask |= 1 << (ord(v) - 97)
+                pos_allow[i] = 1 << (ord(v) - 97)
+            else:
+                for c in set.union(self.unknown_chars[i], self.blacked_out):
+                    pos_allow[i] &= ~(1 << (ord(c) - 97))
+        for chars in self.unknown_chars.values():
+            for c in chars:
+                required_mask |= 1 << (ord(c) - 97)
+        if not required_mask and all(p == ALL_LETTERS for p in pos_allow):
+            self.potential_words = [w for w, _, _ in WORD_MASKS]
+            return
+        self.verbose(f"search: required={required_mask:#08x} "
+                     f"allowed={[f'{p:#08x}' for p in pos_allow]}")
+        if njit and NP_MASKS is not None:
+            pa = zeros(WORD_LENGTH, dtype=uint32)
+            for i, p in enumerate(pos_allow):
+                pa[i] = p
+            n = filter_words(NP_MASKS, NP_POSITIONS, uint32(required_mask),
+                             pa, NP_OUT)
+            self.potential_words = [WORD_MASKS[NP_OUT[i]][0] for i in range(n)]
+            return
+        if NP_MASKS is not None:
+            # Vectorized over all candidates at once: one AND/compare per
+            # constraint instead of a Python loop per word.
+            alive = (NP_MASKS & uint32(required_mask)) == uint32(required_mask)
+            for p in range(WORD_LENGTH):
+                if pos_allow[p] != ALL_LETTERS:
+                    alive &= (NP_POS_BITS[:, p] & uint32(pos_allow[p])) != 0
+            self.potential_words = [WORD_MASKS[i][0]
+                                    for i in flatnonzero(alive)]
+            return
+        self.potential_words = [w for w, m, pos in WORD_MASKS
+                                if m & required_mask == required_mask and
+                                all(pos_allow[i] & (1 << pos[i])
+                                    for i in range(WORD_LENGTH))]
+
+    def __search_dictionary_regex(self):
+        """Regex fallback used when the word masks are unavailable. Words
+        missing a required letter, or carrying a known dud, are rejected
+        with plain substring checks before the regex runs, testing the
+        rarest required letter first for the highest reject rate.
         """
-        self.potential_words = []
         temp_str = ''.join(self.srch_str)
         tl = self.unknown_chars.values()
         rl = set([item for tl in tl for item in tl])
+        greens = {v for v in self.srch_str if len(v) == 1}
+        if not rl and not self.blacked_out and not greens:
+            self.potential_words = list(THE_WORDS)
+            return
+        req = sorted(rl, key=lambda c: LETTER_RANK[ord(c) - 97])
+        blacked = [b for b in self.blacked_out if b not in greens]
         required_letters = [f"(?=.*{c})" for c in rl]
         ss = f"(?:{''.join(required_letters)})^{temp_str}$" if \
                                     required_letters else rf"^{temp_str}$"
         self.verbose(f"search: {ss}")
-        regex = compile(ss)
-        _ = [self.potential_words.append(w) for w in THE_WORDS if regex.search(w)]
+        regex = compile_search(ss)
+        self.potential_words = [w for w in THE_WORDS
+                                if all(c in w for c in req) and
+                                not any(b in w for b in blacked) and
+                                regex.search(w)]
 
     def __gen_frequency(self):
         """Calculate letter frequency amost all five-letter words in the
         dictionary and create an algorithm weighing groups of letters and
         distribution.
         """
-        # Count all letters across all words in the dictionary.
-        letter_count = Counter()
-        _ = [letter_count.update(w) for w in self.potential_words]
+        letter_count, letter_groups, weights = \
+            gen_weights(tuple(self.potential_words))
         self.verbose(f"letter count: {letter_count}")
-
-        # Group the letters by 10%. Counters are ordered by value.
-        letter_groups = {i:[] for i in range(7)}
-        i, rank = (0, 0)
-        for letter, count in letter_count.most_common():
-            if rank == 0:
-                rank = count
-            letter_groups.setdefault(i, [])
-            if count <= int(.9*rank):
-                i += 1
-                rank = count
-                letter_groups.setdefault(i, [])
-            letter_groups[i].extend(letter)
         self.verbose(f"letter_groups: {letter_groups}")
-
-        self.frequency = lambda c: [len(set(c[1].keys()))*8] + \
-                                   [c[1][l]*7 for l in letter_groups[0]] + \
-                                   [c[1][l]*6 for l in letter_groups[1]] + \
-                                   [c[1][l]*5 for l in letter_groups[2]] + \
-                                   [c[1][l]*4 for l in letter_groups[3]] + \
-                                   [c[1][l]*3 for l in letter_groups[4]] + \
-                                   [c[1][l]*2 for l in letter_groups[5]] + \
-                                   [c[1][l] for l in letter_groups[6]]
+        self.weights = weights
+        self.frequency = gen_scorer(weights)
 
     def __letter_frequency(self):
-        """Create a dictionary of words with 'word': Counter('word') as k, v.
-        Sort the dictionary weighing groups of letters by frequency of
-        occurance in the group and distribution of letters in the word.
+        """Sort the potential words weighing groups of letters by frequency
+        of occurance in the group and distribution of letters in the word.
         Set `self.potential_words` as the sorted list.
 
         TODO: the algorithm should be calculated based on the dictionary used
         """
-        potential_words = {w: Counter(w) for w in self.potential_words}
-        potential_words = {k: v for k, v in sorted(potential_words.items(),
-                           key=self.frequency, reverse=True)}
-        self.potential_words = [k for k in potential_words]
+        if self.assistance and not self.simulate and not self.verbosity and \
+                not isinstance(THE_WORDS, dict):
+            # Only the top suggestions are consumed interactively, so a
+            # bounded heap selection beats sorting the whole list. CSV
+            # dictionaries need the full ranking for their badness
+            # re-sort below, and verbose mode prints the whole list.
+            self.potential_words = nlargest(5, self.potential_words,
+                                            key=self.frequency)
+        else:
+            self.potential_words = \
+                list(rank_words(tuple(self.potential_words), self.weights))
         # If the dictionary is a dict then prioritise with weights
         if isinstance(THE_WORDS, dict):
             self.potential_words = sorted(self.potential_words,
                                           key=lambda word: THE_WORDS[word])
+        self.ranked = True
 
     def __check_guess(self):
         self.__gen_wordle()
-        self.__gen_search()
+        # The search string rewrite only feeds the regex fallback.
+        if not WORD_MASKS:
+            self.__gen_search()
         self.search_dictionary()
 
     def __gen_wordle(self):
-        """Enumerate through `self.user_word` and compare each character with
-        `self.game_word`. Update `self.wrdl` with the appropriate character and
-        recreate the search string based on the results."""
-        for i, v in enumerate(self.user_word):
-            if self.game_word[i].lower() == v:
-                self.wrdl[i] = f"\033[1;42m {v.upper()} \033[m"
-                self.srch_str[i] = v
-            elif v in self.game_word:
-                self.wrdl[i] = f"\033[1;43m {v.upper()} \033[m"
-                self.unknown_chars[i].add(v)
+        """Score `self.user_word` against `self.game_word` as one trit per
+        position (2 green, 1 yellow, 0 black), honouring letter
+        multiplicity, and update the search constraints. The ANSI tiles
+        are only rendered when they will be printed, which spares the
+        simulator the string churn entirely."""
+        guess = self.user_word
+        game = self.game_lower
+        state = [0] * WORD_LENGTH
+        remaining = {}
+        feedback = 0
+        for i in range(WORD_LENGTH):
+            if game[i] == guess[i]:
+                state[i] = 2
+                feedback += 2 * POW3[i]
+                self.srch_str[i] = guess[i]
             else:
-                self.wrdl[i] = f"\033[1;30m {v.upper()} \033[m"
+                remaining[game[i]] = remaining.get(game[i], 0) + 1
+        for i, v in enumerate(guess):
+            if state[i] == 2:
+                continue
+            if remaining.get(v, 0):
+                state[i] = 1
+                feedback += POW3[i]
+                remaining[v] -= 1
+                self.unknown_chars[i].add(v)
+            elif v not in self.game_set:
                 self.blacked_out.add(v)
+        self.feedback = feedback
+        if not self.quiet:
+            colours = ("\033[1;30m", "\033[1;43m", "\033[1;42m")
+            self.wrdl = [f"{colours[state[i]]} {v.upper()} \033[m"
+                         for i, v in enumerate(guess)]
 
     def __gen_search(self):
         """Generate a list of search strings injecting the unknown characters
@@ -184,7 +454,7 @@ class Wordle():
             self.__check_guess()
             # Print Wordle
             self.printer("".join(self.wrdl))
-            if self.user_word == self.game_word.lower():
+            if self.feedback == ALL_GREEN:
                 self.printer("Good job!")
                 break
             # Print suggested words
@@ -214,41 +484,51 @@ def read_words():
     """Read the dictionary and set THE_WORDS."""
     global THE_WORDS
     wrds = ARGUMENTS.words if ARGUMENTS.words else "/usr/share/dict/words"
-    searcher = compile(f"^[a-z]{{{WORD_LENGTH}}}$")
     try:
         with open(wrds, 'r') as f:
             if is_csv_file(wrds):
                 csv_reader = DictReader(f)
                 THE_WORDS = {row['word']: int(row['bad']) for row in
-                             csv_reader if searcher.search(row['word'])}
+                             csv_reader if is_word(row['word'])}
             else:
-                _ = [THE_WORDS.append(line.strip()) for line in f.readlines()
-                     if searcher.search(line)]
+                # Stream line by line rather than slurping with
+                # readlines().
+                for line in f:
+                    word = line.strip()
+                    if is_word(word):
+                        THE_WORDS.append(word)
     except (OSError, IndexError) as err:
         print(f"Error: {err}")
         exit(1)
+    build_word_tables()
 
-def worker(task):
+def init_worker(words):
+    """Install the dictionary in a freshly started pool worker. The word
+    list is pickled once per worker here rather than once per task.
+    """
+    global THE_WORDS
+    if THE_WORDS != words:
+        THE_WORDS = words
+        build_word_tables()
+
+def worker(firstword):
     """Use word as first guess and simulate a playing all Wordle® words.
     Count the number of successful and unsuccessful games.
-    Print the results.
+    Return the CSV result row.
     """
-    # This is from multiprocessing.pool. We need to set the global THE_WORDS.
-    firstword, words = task
-    global THE_WORDS
-    THE_WORDS = words
     good, bad = 0, 0
-    for word in words:
+    wrdl = Wordle(simulate=True, first=firstword)
+    wrdl.quiet = True
+    for word in THE_WORDS:
         try:
-            wrdl = Wordle(simulate=True, first=firstword, word=word)
-            wrdl.quiet = True
+            wrdl.reset(word)
             if wrdl.play(user_guess):
                 good += 1
             else:
                 bad += 1
         except KeyboardInterrupt:
-            return
-    print(f"{firstword},{good},{bad}", flush=True)
+            return None
+    return f"{firstword},{good},{bad}"
 
 def simulator():
     """Play Wordle® as a simulator.
@@ -268,12 +548,25 @@ def simulator():
 
     print("word,good,bad", flush=True)
 
-    # Make a copy of THE_WORDS as passing a global to a thread pool uses loads
-    # of system cpu / context switching.
-    dictionary = THE_WORDS
-    tasks = [(firstword, dictionary) for firstword in words]
-    with Pool(processes=cpu_count()) as pool:
-        pool.map(worker, tasks)
+    # Compile the filter once in the parent so forked workers reuse the
+    # cached machine code instead of compiling per process.
+    if njit and NP_MASKS is not None:
+        pa = zeros(WORD_LENGTH, dtype=uint32)
+        pa[:] = ALL_LETTERS
+        filter_words(NP_MASKS, NP_POSITIONS, uint32(0), pa, NP_OUT)
+    # Stream rows as workers finish: imap_unordered keeps memory flat and
+    # doesn't serialize output behind the slowest task.
+    chunksize = max(1, len(words) // (cpu_count() * 8))
+    with Pool(processes=cpu_count(), initializer=init_worker,
+              initargs=(THE_WORDS,)) as pool:
+        # Buffer rows and flush in batches rather than syscall per row.
+        for n, row in enumerate(pool.imap_unordered(worker, words,
+                                                    chunksize), 1):
+            if row:
+                stdout.write(f"{row}\n")
+            if n % 64 == 0:
+                stdout.flush()
+    stdout.flush()
 
 if __name__ == "__main__":
     # Get command-line arguments
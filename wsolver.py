@@ -20,10 +20,68 @@ from sys import stdin
 from csv import Sniffer, reader as csvreader, Error as CsvError, DictReader
 from json import loads, JSONDecodeError
 from argparse import ArgumentParser
-from re import compile
-from collections import Counter
+# The third-party regex module is a drop-in replacement with a faster
+# matcher for the fallback search path; it is optional.
+try:
+    from regex import compile
+except ImportError:
+    from re import compile
 
 WORD_LENGTH = 5
+ALL_LETTERS = (1 << 26) - 1
+
+def is_word(s):
+    """Five lowercase ASCII letters -- C-level checks, no regex."""
+    return len(s) == WORD_LENGTH and s.isascii() and s.islower() and \
+           s.isalpha()
+
+def word_masks(words):
+    """Build a (word, presence mask, letter indices) tuple per word where
+    the mask has bit (ord(letter)-97) set for each letter present.
+    """
+    masks = []
+    for w in words:
+        mask = 0
+        for c in w:
+            mask |= 1 << (ord(c) - 97)
+        masks.append((w, mask, tuple(ord(c) - 97 for c in w)))
+    return masks
+
+def gen_scorer(weights, letters, distinct):
+    """Partially evaluate the scoring function for a weight table by
+    exec'ing a straight-line expression with the weights baked in as a
+    literal -- no loop or generator per scored word.
+    """
+    terms = " + ".join(f"_W[l[{i}]]" for i in range(WORD_LENGTH))
+    src = (f"def scorer(w, _L=_L, _D=_D, _W={tuple(weights)!r}):\n"
+           f"    l = _L[w]\n"
+           f"    return {terms} + _D[w] * 8\n")
+    namespace = {"_L": letters, "_D": distinct}
+    exec(src, namespace)
+    return namespace["scorer"]
+
+def build_trie(words):
+    """Build a depth-WORD_LENGTH trie over the words as parallel lists of
+    per-node child-presence bitmaps, child pointers and leaf word ids.
+    """
+    child_mask = [0]
+    children = [{}]
+    leaf_word = [-1]
+    for wid, w in enumerate(words):
+        node = 0
+        for c in w:
+            b = ord(c) - 97
+            nxt = children[node].get(b)
+            if nxt is None:
+                nxt = len(child_mask)
+                children[node][b] = nxt
+                child_mask[node] |= 1 << b
+                child_mask.append(0)
+                children.append({})
+                leaf_word.append(-1)
+            node = nxt
+        leaf_word[node] = wid
+    return child_mask, children, leaf_word
 
 def is_csv_file(file_path):
     """Detect if file_path is a CSV file"""
@@ -41,15 +99,17 @@ def is_csv_file(file_path):
 def read_words(dfile=None):
     """Read the dictionary and set THE_WORDS."""
     wrds = dfile if dfile else "/usr/share/dict/words"
-    searcher = compile(f"^[a-z]{{{WORD_LENGTH}}}$")
     try:
         with open(wrds, 'r') as f:
             if is_csv_file(wrds):
                 csv_reader = DictReader(f)
                 return {row['word']: int(row['bad']) for row in
-                        csv_reader if searcher.search(row['word'])}
+                        csv_reader if is_word(row['word'])}
             else:
-                return [line.strip() for line in f.readlines() if searcher.search(line)]
+                # Stream line by line rather than slurping with
+                # readlines().
+                return [w for w in (line.strip() for line in f)
+                        if is_word(w)]
     except (OSError, IndexError) as err:
         print(f"Error: {err}")
         exit(255)
@@ -67,31 +127,44 @@ class WordleSolver():
         self.srch_str = ['[a-z]{1}'] * WORD_LENGTH
         self.dictionary = cargs.words if cargs.words else "/usr/share/dict/words"
         self.the_words = read_words(self.dictionary)
+        self.word_masks = word_masks(self.the_words)
+        self.scorer_cache = {}
+        self.word_letters = {w: pos for w, _, pos in self.word_masks}
+        self.word_distinct = {w: len(set(pos)) for w, _, pos in
+                              self.word_masks}
+        self.letter_rank = [0] * 26
+        for _, _, pos in self.word_masks:
+            for c in pos:
+                self.letter_rank[c] += 1
+        self.trie = build_trie([w for w, _, _ in self.word_masks])
+        self.regex_cache = {}
         self.interactive = cargs.interactive
         self.verbose = print if cargs.verbose else lambda a, **v: None
 
     def __user_prompt(self, cargs):
-        """Prompt the user for known letters and duds."""
+        """Prompt the user for known letters and duds. Hints are free-text,
+        so lowercase them and drop anything outside a-z (separators,
+        stray punctuation) before they reach the search structures.
+        """
         for i, l in enumerate(self.letters):
             if self.interactive:
                 known = input(f"{l} known letter: ")
             else:
                 known = eval(f"cargs.{l}")
             if known.startswith('!'):
-                _ = [self.unknown_chars[i].add(c) for c in known[1:]]
+                _ = [self.unknown_chars[i].add(c) for c in known[1:].lower()
+                     if 'a' <= c <= 'z']
             elif known:
-                self.srch_str[i] = known
-        if self.interactive:
-            _ = [self.blacked_out.add(c) for c in input("Known duds: ")]
-        else:
-            _ = [self.blacked_out.add(c) for c in cargs.dud]
+                known = ''.join(c for c in known.lower() if 'a' <= c <= 'z')
+                if known:
+                    self.srch_str[i] = known
+        duds = input("Known duds: ") if self.interactive else cargs.dud
+        _ = [self.blacked_out.add(c) for c in duds.lower() if 'a' <= c <= 'z']
 
     def __letter_frequency(self):
-        """Count the letters in potential words and sort by frequency."""
-        potential_words = {w: Counter(w) for w in self.potential_words}
-        potential_words = {k: v for k, v in sorted(potential_words.items(),
-                           key=self.frequency, reverse=True)}
-        self.potential_words = [k for k in potential_words]
+        """Sort the potential words by their letter-frequency score."""
+        self.potential_words = sorted(self.potential_words,
+                                      key=self.frequency, reverse=True)
         if isinstance(self.the_words, dict):
             self.potential_words = sorted(self.potential_words,
                                           key=lambda word: self.the_words[word])
@@ -102,15 +175,21 @@ class WordleSolver():
         distribution.
         """
 
-        # Count all letters across all potential words.
-        letter_count = Counter()
-        _ = [letter_count.update(w) for w in self.potential_words]
+        # Tally letters across all potential words from the precomputed
+        # letter indices -- no per-word Counter allocations.
+        counts = [0] * 26
+        for w in self.potential_words:
+            for c in self.word_letters[w]:
+                counts[c] += 1
+        letter_count = sorted(((chr(c + 97), n) for c, n in
+                               enumerate(counts) if n),
+                              key=lambda lc: lc[1], reverse=True)
         self.verbose(f"letter_count: {letter_count}")
 
-        # Group the letters by 10%. Counters are ordered by value.
+        # Group the letters by 10%.
         letter_groups = {i:[] for i in range(7)}
         i, rank = (0, 0)
-        for letter, count in letter_count.most_common():
+        for letter, count in letter_count:
             if rank == 0:
                 rank = count
             letter_groups.setdefault(i, [])
@@ -120,14 +199,20 @@ class WordleSolver():
                 letter_groups.setdefault(i, [])
             letter_groups[i].extend(letter)
         self.verbose(f"letter_groups: {letter_groups}")
-        self.frequency = lambda c: [len(set(c[1].keys()))*8] + \
-                                   [c[1][l]*7 for l in letter_groups[0]] + \
-                                   [c[1][l]*6 for l in letter_groups[1]] + \
-                                   [c[1][l]*5 for l in letter_groups[2]] + \
-                                   [c[1][l]*4 for l in letter_groups[3]] + \
-                                   [c[1][l]*3 for l in letter_groups[4]] + \
-                                   [c[1][l]*2 for l in letter_groups[5]] + \
-                                   [c[1][l] for l in letter_groups[6]]
+
+        # Flatten the groups into a per-letter weight table so scoring a
+        # word is one lookup per letter instead of rebuilding group lists.
+        weights = [0] * 26
+        for group, mult in enumerate((7, 6, 5, 4, 3, 2, 1)):
+            for l in letter_groups[group]:
+                weights[ord(l) - 97] = mult
+        self.weights = weights
+        key = tuple(weights)
+        try:
+            self.frequency = self.scorer_cache[key]
+        except KeyError:
+            self.frequency = self.scorer_cache[key] = \
+                gen_scorer(weights, self.word_letters, self.word_distinct)
 
     def __gen_search(self):
         for i, v in enumerate(self.srch_str):
@@ -139,19 +224,93 @@ class WordleSolver():
 
     def __search_dictionary(self):
         """Consult known matched characters `self.srch_str` to narrow down
-        word candidates.
+        word candidates. Each word carries a 26-bit letter-presence mask, so
+        candidates are kept with integer ANDs against a required-letter mask
+        and a per-position allowed-letter mask -- no regex engine involved.
+        """
+        if not self.word_masks:
+            self.__search_dictionary_regex()
+            return
+        required_mask = 0
+        pos_allow = [ALL_LETTERS] * WORD_LENGTH
+        for i, v in enumerate(self.srch_str):
+            if len(v) == 1:
+                required_mask |= 1 << (ord(v) - 97)
+                pos_allow[i] = 1 << (ord(v) - 97)
+            else:
+                for c in set.union(self.unknown_chars[i], self.blacked_out):
+                    pos_allow[i] &= ~(1 << (ord(c) - 97))
+        for chars in self.unknown_chars.values():
+            for c in chars:
+                required_mask |= 1 << (ord(c) - 97)
+        if not required_mask and all(p == ALL_LETTERS for p in pos_allow):
+            self.potential_words = [w for w, _, _ in self.word_masks]
+            return
+        self.verbose(f"search: required={required_mask:#08x} "
+                     f"allowed={[f'{p:#08x}' for p in pos_allow]}")
+        if self.trie:
+            self.potential_words = self.__walk_trie(required_mask, pos_allow)
+            return
+        self.potential_words = [w for w, m, pos in self.word_masks
+                                if m & required_mask == required_mask and
+                                all(pos_allow[i] & (1 << pos[i])
+                                    for i in range(WORD_LENGTH))]
+
+    def __walk_trie(self, required_mask, pos_allow):
+        """Walk the dictionary trie, descending only branches allowed at
+        each position and pruning subtrees that can no longer supply the
+        outstanding required letters.
+        """
+        child_mask, children, leaf_word = self.trie
+        found = []
+
+        def walk(node, depth, required):
+            if depth == WORD_LENGTH:
+                if not required:
+                    found.append(self.word_masks[leaf_word[node]][0])
+                return
+            if required.bit_count() > WORD_LENGTH - depth:
+                return
+            cm = child_mask[node] & pos_allow[depth]
+            while cm:
+                b = cm & -cm
+                walk(children[node][b.bit_length() - 1], depth + 1,
+                     required & ~b)
+                cm ^= b
+
+        walk(0, 0, required_mask)
+        return found
+
+    def __search_dictionary_regex(self):
+        """Regex fallback used when the word masks are unavailable. The
+        words are already stripped five-letter tokens, so the search string
+        needs no anchors and `match` suffices. Compiled patterns are cached
+        so repeated prompts don't recompile, and words missing a required
+        letter or carrying a known dud are rejected with plain substring
+        checks before the regex runs, rarest required letter first.
         """
-        self.potential_words = []
         temp_str = ''.join(self.srch_str)
         tl = self.unknown_chars.values()
         rl = set([item for tl in tl for item in tl])
-        required_letters = [f"(?=.*{c})" for c in rl]
-        ss = f"(?:{''.join(required_letters)})^{temp_str}$" if \
-                          required_letters else rf"^{temp_str}$"
-        self.verbose(f"search: {ss}")
-        regex = compile(ss)
-        _ = [self.potential_words.append(w) for w in self.the_words if
-             regex.search(w)]
+        greens = {v for v in self.srch_str if len(v) == 1}
+        if not rl and not self.blacked_out and not greens:
+            self.potential_words = list(self.the_words)
+            return
+        req = sorted(rl, key=lambda c: self.letter_rank[ord(c) - 97])
+        blacked = [b for b in self.blacked_out if b not in greens]
+        cache_key = (temp_str, frozenset(rl))
+        try:
+            regex = self.regex_cache[cache_key]
+        except KeyError:
+            required_letters = [f"(?=.*{c})" for c in rl]
+            ss = f"{''.join(required_letters)}{temp_str}" if \
+                              required_letters else temp_str
+            self.verbose(f"search: {ss}")
+            regex = self.regex_cache[cache_key] = compile(ss)
+        self.potential_words = [w for w in self.the_words
+                                if all(c in w for c in req) and
+                                not any(b in w for b in blacked) and
+                                regex.match(w)]
 
     def play(self, cargs=None):
         """Play the game"""